@@ -2,16 +2,31 @@
 """DearDayOne - Export reMarkable handwritten journal pages to Day One."""
 
 import argparse
+import atexit
+import functools
 import json
 import os
+import select
+import shlex
 import shutil
 import sqlite3
 import subprocess
 import sys
 import tempfile
-from datetime import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import orjson  # optional, faster JSON parsing
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson  # optional (pysimdjson), lazy parsing of .content files
+except ImportError:
+    simdjson = None
+
 # Default paths
 REMARKABLE_DATA_DIR = Path.home() / "Library/Containers/com.remarkable.desktop/Data/Library/Application Support/remarkable/desktop"
 DAYONE_DATA = Path.home() / "Library/Group Containers/5U8NS4GX82.dayoneapp2/Data/Documents"
@@ -19,154 +34,358 @@ DAYONE_DB = DAYONE_DATA / "DayOne.sqlite"
 DAYONE_PENDING_MEDIA = DAYONE_DATA / "PendingMedia"
 CONFIG_DIR = Path.home() / ".config/deardayone"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+EXPORT_LOG_FILE = CONFIG_DIR / "exported_pages.log"
+CONTENT_CACHE_FILE = CONFIG_DIR / ".content_cache.json"
 RMC_BIN = Path.home() / ".local/bin/rmc"
 INKSCAPE_BIN = "/opt/homebrew/bin/inkscape"
 DAYONE_BIN = "/usr/local/bin/dayone"
 
+# Seconds to wait for the Inkscape shell to finish one command
+INKSCAPE_SHELL_TIMEOUT = 120
+
+# Each conversion worker process keeps its own Inkscape shell, started on
+# first use
+_inkscape_shell = None
+
+# Shared read-only connection to the Day One database, opened on first use
+_dayone_conn = None
+
+# Number of threads used to read notebook files during discovery
+DISCOVERY_WORKERS = 8
+
+# Number of Day One entries created per dayone batch
+DAYONE_BATCH_SIZE = 50
+
+# Number of newly exported pages to collect in the export log before folding
+# them into config.json
+EXPORT_LOG_COMPACT_EVERY = 50
+
+
+def _read_json(path):
+    """Read and parse a JSON file, using orjson if it's installed.
+
+    The file is read as bytes in one go, skipping text decoding.
+    """
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_json_file(path, mtime_ns):
+    """Parse a JSON file. Cached per (path, mtime_ns) by _load_json."""
+    return _read_json(path)
+
+
+def _load_json(path):
+    """Load a JSON file, reusing the parsed result if it hasn't changed.
+
+    The returned object is shared between callers and must not be modified.
+    """
+    path = os.fspath(path)
+    return _parse_json_file(path, os.stat(path).st_mtime_ns)
+
+
+def _page_tuple(page):
+    """Return (id, modified_ms) for a cPages.pages entry, or None if no id.
+
+    A missing or unparseable timestamp gives 0, so run_export falls back to
+    the .rm file's mtime.
+    """
+    if "id" not in page:
+        return None
+    # The field is misspelled "modifed" in reMarkable's format
+    modified_ms = page.get("modifed", page.get("modified", "0"))
+    try:
+        modified_ms = int(modified_ms) if modified_ms else 0
+    except (ValueError, TypeError):
+        modified_ms = 0
+    return page["id"], modified_ms
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_content_file(path, mtime_ns):
+    """Extract (file_type, page_count, pages) from a .content file.
+
+    pages is a list of (id, modified_ms) tuples in display order, with the
+    timestamps already converted to int; page_count also counts entries
+    without an id. Cached per (path, mtime_ns) by _load_content. With
+    pysimdjson installed, only fileType and each page's id/modified fields
+    are converted to Python objects; the rest of the document is never
+    materialized.
+    """
+    if simdjson is None:
+        content = _read_json(path)
+        c_pages = content.get("cPages", {})
+        raw_pages = c_pages.get("pages", []) if isinstance(c_pages, dict) else []
+        file_type = content.get("fileType", "")
+    else:
+        # A fresh parser per call: documents from a shared parser are
+        # invalidated by the next parse, and discovery parses from several
+        # threads.
+        doc = simdjson.Parser().parse(Path(path).read_bytes())
+        if not isinstance(doc, simdjson.Object):
+            return "", 0, []
+        c_pages = doc.get("cPages")
+        raw_pages = c_pages.get("pages") if isinstance(c_pages, simdjson.Object) else None
+        if not isinstance(raw_pages, simdjson.Array):
+            raw_pages = []
+        file_type = doc.get("fileType", "")
+
+    # Pages of PDFs and EPUBs are never used
+    pages = []
+    if file_type == "notebook":
+        for page in raw_pages:
+            info = _page_tuple(page)
+            if info is not None:
+                pages.append(info)
+    return file_type, len(raw_pages), pages
+
+
+def _load_content(path):
+    """Load a .content file, reusing unchanged results.
+
+    Returns (file_type, page_count, pages) as described in
+    _parse_content_file. The returned list is shared between callers and must
+    not be modified. Raises ValueError if the file isn't valid JSON.
+    """
+    path = os.fspath(path)
+    return _parse_content_file(path, os.stat(path).st_mtime_ns)
+
 
 def load_config():
-    """Load config or return None if not found."""
+    """Load config or return None if not found.
+
+    Page IDs recorded in the export log since the last save are merged into
+    exported_pages.
+    """
     if not CONFIG_FILE.exists():
         return None
-    with open(CONFIG_FILE) as f:
-        return json.load(f)
+    # Shallow copy, since callers update the config before saving it
+    config = dict(_load_json(CONFIG_FILE))
+    logged = _read_export_log()
+    if logged:
+        exported_pages = config.get("exported_pages", []) + logged
+        config["exported_pages"] = list(dict.fromkeys(exported_pages))
+    return config
+
 
+def save_config(config, exported_pages=None):
+    """Save config, creating directory if needed.
 
-def save_config(config):
-    """Save config, creating directory if needed."""
+    If exported_pages is given (any iterable, e.g. the in-memory set of page
+    IDs), it's saved in place of config["exported_pages"] without modifying
+    config.
+
+    The saved config is the complete export state, so the export log is
+    emptied afterwards.
+    """
+    if exported_pages is not None:
+        config = {**config, "exported_pages": sorted(exported_pages)}
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    if orjson is not None:
+        with open(CONFIG_FILE, "wb") as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+    else:
+        with open(CONFIG_FILE, "w") as f:
+            json.dump(config, f, indent=2)
+    if EXPORT_LOG_FILE.exists():
+        open(EXPORT_LOG_FILE, "w").close()
+
+
+def _read_export_log():
+    """Return the page IDs recorded in the export log, in order."""
+    try:
+        with open(EXPORT_LOG_FILE) as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    # Only complete lines count; a trailing partial line means we were
+    # interrupted mid-write.
+    return [line for line in data.split("\n")[:-1] if line]
+
+
+def _open_export_log():
+    """Open the export log for appending and return its file descriptor."""
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    return os.open(EXPORT_LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+
+def _append_export_log(log_fd, page_id):
+    """Durably record one exported page ID in the export log."""
+    os.write(log_fd, f"{page_id}\n".encode())
+    os.fsync(log_fd)
 
 
 def discover_notebooks(data_dir):
     """Scan reMarkable data folder and return list of handwritten notebooks.
 
-    Returns list of dicts: {guid, name, parent, created, modified, page_count}
+    Returns (notebooks, folders): notebooks is a list of dicts
+    {guid, name, parent, created, modified, page_count, rm_count}, and folders
+    maps each folder GUID to its visible name.
     """
-    notebooks = []
-    data_path = Path(data_dir)
+    data_path = os.fspath(data_dir)
+
+    # One pass over the data folder with plain strings, bucketing entries by
+    # kind, so scanning a notebook needs no extra stat calls. Anything that
+    # isn't a readable file fails to load below and is skipped there.
+    metadata_files = {}
+    content_files = {}
+    dir_set = set()
+    with os.scandir(data_path) as it:
+        for entry in it:
+            name = entry.name
+            if name.endswith(".metadata"):
+                metadata_files[name[:-9]] = entry.path
+            elif name.endswith(".content"):
+                content_files[name[:-8]] = entry.path
+            elif entry.is_dir():
+                dir_set.add(name)
+
+    # File types from the last scan, so unchanged PDFs and EPUBs don't need
+    # their .content parsed again. The scan fills in the current types.
+    cached_types = _load_content_cache()
+    file_types = {}
+
+    # Each notebook is mostly file I/O and JSON parsing, so scan them in
+    # parallel threads.
+    with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+        results = executor.map(
+            lambda guid: _scan_notebook(
+                data_path, guid, metadata_files[guid],
+                content_files.get(guid), guid in dir_set,
+                cached_types, file_types,
+            ),
+            metadata_files,
+        )
+        notebooks = []
+        folders = {}
+        for guid, (meta, notebook) in zip(metadata_files, results):
+            if notebook is not None:
+                notebooks.append(notebook)
+            elif meta is not None and meta.get("type") == "CollectionType":
+                folders[guid] = meta.get("visibleName", "")
 
-    # Find all .metadata files
-    for meta_file in data_path.glob("*.metadata"):
-        guid = meta_file.stem
-        try:
-            with open(meta_file) as f:
-                meta = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            continue
+    if file_types != cached_types:
+        _save_content_cache(file_types)
 
-        # Must be a document, not a folder
-        if meta.get("type") != "DocumentType":
-            continue
+    # Sort alphabetically by name
+    notebooks.sort(key=lambda n: n["name"].lower())
+    return notebooks, folders
 
-        # Skip trashed items
-        if meta.get("parent") == "trash":
-            continue
 
-        # Check .content file to distinguish notebooks from PDFs
-        content_file = data_path / f"{guid}.content"
-        if not content_file.exists():
-            continue
+def _load_content_cache():
+    """Load the {guid: [mtime_ns, file_type]} cache of .content file types.
 
-        try:
-            with open(content_file) as f:
-                content = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            continue
+    Malformed entries are dropped, so a damaged cache just means a slower scan.
+    """
+    try:
+        cache = _load_json(CONTENT_CACHE_FILE)
+    except (ValueError, OSError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    return {
+        guid: entry for guid, entry in cache.items()
+        if isinstance(entry, list) and len(entry) == 2
+        and isinstance(entry[0], int) and isinstance(entry[1], str)
+    }
 
-        # Only keep notebooks — skip PDFs and EPUBs
-        file_type = content.get("fileType", "")
-        if file_type != "notebook":
-            continue
 
-        # Count pages
-        pages = []
-        c_pages = content.get("cPages", {})
-        if isinstance(c_pages, dict):
-            pages = c_pages.get("pages", [])
-        page_count = len(pages)
-
-        # Count how many actually have .rm files
-        notebook_dir = data_path / guid
-        rm_count = 0
-        if notebook_dir.is_dir():
-            for page in pages:
-                page_id = page.get("id", "")
-                rm_file = notebook_dir / f"{page_id}.rm"
-                if rm_file.exists():
-                    rm_count += 1
-
-        notebooks.append({
-            "guid": guid,
-            "name": meta.get("visibleName", "(unnamed)"),
-            "parent": meta.get("parent", ""),
-            "created": meta.get("createdTime", "0"),
-            "modified": meta.get("lastModified", "0"),
-            "page_count": page_count,
-            "rm_count": rm_count,
-        })
+def _save_content_cache(file_types):
+    """Save the .content file type cache. Failing to save it is harmless."""
+    try:
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        with open(CONTENT_CACHE_FILE, "w") as f:
+            json.dump(file_types, f)
+    except OSError:
+        pass
 
-    # Sort alphabetically by name
-    notebooks.sort(key=lambda n: n["name"].lower())
-    return notebooks
 
+def _scan_notebook(data_path, guid, meta_file, content_file, has_dir,
+                   cached_types, file_types):
+    """Read one entry's metadata and content files.
 
-def get_folder_name(data_dir, parent_guid):
-    """Resolve a folder GUID to its visible name."""
-    if not parent_guid or parent_guid in ("", "trash"):
-        return ""
-    meta_file = Path(data_dir) / f"{parent_guid}.metadata"
-    if not meta_file.exists():
-        return ""
+    Returns (meta, notebook): meta is the parsed metadata, or None if it
+    couldn't be read, and notebook is a notebook dict for discover_notebooks,
+    or None if the entry isn't a live handwritten notebook.
+
+    cached_types is the .content file type cache from the last scan; the
+    entry's current [mtime_ns, file_type] is recorded in file_types.
+    """
     try:
-        with open(meta_file) as f:
-            meta = json.load(f)
-        return meta.get("visibleName", "")
+        meta = _load_json(meta_file)
     except (json.JSONDecodeError, OSError):
-        return ""
+        return None, None
+
+    # Must be a document, not a folder
+    if meta.get("type") != "DocumentType":
+        return meta, None
+
+    # Skip trashed items
+    if meta.get("parent") == "trash":
+        return meta, None
+
+    # Check .content file to distinguish notebooks from PDFs
+    if content_file is None:
+        return meta, None
+
+    try:
+        mtime_ns = os.stat(content_file).st_mtime_ns
+        cached = cached_types.get(guid)
+        if cached and cached[0] == mtime_ns and cached[1] != "notebook":
+            # Unchanged PDF or EPUB; no need to parse it again
+            file_types[guid] = cached
+            return meta, None
+        file_type, page_count, pages = _parse_content_file(content_file, mtime_ns)
+    except (ValueError, OSError):
+        return meta, None
+    file_types[guid] = [mtime_ns, file_type]
+
+    # Only keep notebooks — skip PDFs and EPUBs
+    if file_type != "notebook":
+        return meta, None
+
+    # Count how many actually have .rm files
+    rm_count = 0
+    if has_dir:
+        try:
+            with os.scandir(os.path.join(data_path, guid)) as it:
+                page_files = {entry.name for entry in it}
+        except OSError:
+            page_files = set()
+        for page_id, _ in pages:
+            if f"{page_id}.rm" in page_files:
+                rm_count += 1
+
+    return meta, {
+        "guid": guid,
+        "name": meta.get("visibleName", "(unnamed)"),
+        "parent": meta.get("parent", ""),
+        "created": meta.get("createdTime", "0"),
+        "modified": meta.get("lastModified", "0"),
+        "page_count": page_count,
+        "rm_count": rm_count,
+    }
 
 
 def get_page_list(data_dir, guid):
     """Get ordered list of page info for a notebook.
 
-    Returns list of dicts: {id, modified_ms} in display order.
+    Returns list of (id, modified_ms) tuples in display order.
     The modified_ms comes from the 'modifed' (sic) field in the content file,
     which is epoch milliseconds.
     """
     content_file = Path(data_dir) / f"{guid}.content"
-    with open(content_file) as f:
-        content = json.load(f)
+    _, _, pages = _load_content(content_file)
+    return pages
 
-    c_pages = content.get("cPages", {})
-    if isinstance(c_pages, dict):
-        pages = c_pages.get("pages", [])
-    else:
-        pages = []
-
-    result = []
-    for p in pages:
-        if "id" not in p:
-            continue
-        # The field is misspelled "modifed" in reMarkable's format
-        modified_ms = p.get("modifed", p.get("modified", "0"))
-        result.append({
-            "id": p["id"],
-            "modified_ms": int(modified_ms) if modified_ms else 0,
-        })
-    return result
-
-
-def convert_rm_to_png(rm_path, output_path):
-    """Convert a .rm file to PNG using rmc (for SVG) and Inkscape (for PNG).
-
-    Pipeline: .rm → SVG (via rmc) → PNG (via Inkscape)
-    """
-    svg_path = str(output_path).rsplit(".", 1)[0] + ".svg"
 
-    # Step 1: .rm → SVG
+def rm_to_svg(rm_path, svg_path):
+    """Convert a .rm file to SVG using rmc."""
     result = subprocess.run(
-        [str(RMC_BIN), "-t", "svg", str(rm_path), "-o", svg_path],
+        [str(RMC_BIN), "-t", "svg", str(rm_path), "-o", str(svg_path)],
         capture_output=True,
         text=True,
     )
@@ -175,36 +394,133 @@ def convert_rm_to_png(rm_path, output_path):
         lines = stderr.splitlines()
         error_line = lines[-1] if lines else "unknown error"
         raise RuntimeError(f"rmc conversion failed: {error_line}")
+    return svg_path
 
-    # Step 2: SVG → PNG
-    result = subprocess.run(
-        [INKSCAPE_BIN, "--export-type=png",
-         f"--export-filename={output_path}", svg_path],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
-        raise RuntimeError(f"inkscape conversion failed: {result.stderr.strip()}")
 
-    # Clean up intermediate SVG
+class InkscapeShell:
+    """A long-running `inkscape --shell` process for exporting SVGs to PNG.
+
+    Inkscape's startup time dominates converting a single page, so each
+    conversion worker keeps one shell open and sends it one export command
+    per page, waiting for the shell's prompt before returning.
+    """
+
+    PROMPT = b"> "
+
+    def __init__(self):
+        # stderr goes to a temp file so Inkscape's warnings can't fill a pipe
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            [INKSCAPE_BIN, "--shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._stderr,
+            bufsize=0,
+        )
+        # Skip the startup banner
+        self._read_until_prompt()
+
+    def export(self, svg_path, png_path):
+        """Export svg_path to png_path, returning png_path."""
+        stderr_start = self._stderr.tell()
+        command = (
+            f"file-open:{svg_path}; export-type:png; "
+            f"export-filename:{png_path}; export-do; file-close\n"
+        )
+        try:
+            self._proc.stdin.write(command.encode())
+        except BrokenPipeError:
+            self._proc.wait()
+            raise RuntimeError("inkscape conversion failed: shell exited")
+        self._read_until_prompt()
+
+        if not os.path.exists(png_path):
+            self._stderr.seek(stderr_start)
+            lines = self._stderr.read().decode(errors="replace").strip().splitlines()
+            self._stderr.seek(0, os.SEEK_END)
+            error_line = lines[-1] if lines else "no PNG written"
+            raise RuntimeError(f"inkscape conversion failed: {error_line}")
+        return png_path
+
+    def is_running(self):
+        """Return whether the shell process is still alive."""
+        return self._proc.poll() is None
+
+    def close(self):
+        """Ask the shell to quit, killing it if it doesn't."""
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+            self._proc.wait()
+        self._stderr.close()
+
+    def _read_until_prompt(self):
+        fd = self._proc.stdout.fileno()
+        output = b""
+        while not output.endswith(self.PROMPT):
+            ready, _, _ = select.select([fd], [], [], INKSCAPE_SHELL_TIMEOUT)
+            if not ready:
+                # Reap it too, so is_running() reliably reports it as gone
+                self._proc.kill()
+                self._proc.wait()
+                raise RuntimeError("inkscape conversion failed: shell timed out")
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                self._proc.wait()
+                raise RuntimeError("inkscape conversion failed: shell exited")
+            output += chunk
+        return output
+
+
+def _get_inkscape_shell():
+    """Return this process's Inkscape shell, starting it if needed.
+
+    The shell isn't closed explicitly; it exits when the worker process does
+    and its stdin is closed.
+    """
+    global _inkscape_shell
+    if _inkscape_shell is None:
+        _inkscape_shell = InkscapeShell()
+    return _inkscape_shell
+
+
+def convert_rm_to_png(rm_path, output_path):
+    """Convert a .rm file to PNG using rmc (for SVG) and Inkscape (for PNG).
+
+    Pipeline: .rm → SVG (via rmc) → PNG (via the Inkscape shell)
+    """
+    global _inkscape_shell
+    svg_path = str(output_path).rsplit(".", 1)[0] + ".svg"
+
     try:
-        os.remove(svg_path)
-    except OSError:
-        pass
+        rm_to_svg(rm_path, svg_path)
+        try:
+            _get_inkscape_shell().export(svg_path, output_path)
+        finally:
+            # If the shell died or was killed, start a fresh one next time
+            if _inkscape_shell is not None and not _inkscape_shell.is_running():
+                _inkscape_shell.close()
+                _inkscape_shell = None
+    finally:
+        # Clean up intermediate SVG
+        try:
+            os.remove(svg_path)
+        except OSError:
+            pass
 
     return output_path
 
 
-def create_dayone_entry(journal, date_str, tags, attachment_path, body_text):
-    """Create a Day One entry via the dayone CLI.
+def build_dayone_cmd(journal, date_str, tags, attachment_path, body_text):
+    """Build the dayone CLI argv for creating one entry.
+
+    tags is a tuple of tag strings and attachment_path a str path.
 
     Note: dayone's --attachments flag consumes all following arguments until
     it hits '--' or another option, so we place it last and add '--' before
     the 'new' command.
-
-    The dayone CLI has a sandbox bug where it can't copy media files into its
-    PendingMedia folder. We work around this by looking up the attachment UUID
-    it assigned in the database and copying the file there ourselves.
     """
     # Build command with careful argument ordering.
     # dayone's --tags and --attachments are greedy (consume all following args
@@ -216,22 +532,124 @@ def create_dayone_entry(journal, date_str, tags, attachment_path, body_text):
     if date_str:
         cmd.extend(["--date", date_str])
     if tags:
-        cmd.extend(["--tags"] + list(tags))
+        cmd.append("--tags")
+        cmd.extend(tags)
     if attachment_path:
-        cmd.extend(["--attachments", str(attachment_path)])
+        cmd.append("--attachments")
+        cmd.append(attachment_path)
     cmd.append("--")
     cmd.extend(["new", body_text])
+    return cmd
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise RuntimeError(f"dayone failed: {result.stderr.strip()}")
 
-    # Work around dayone CLI sandbox bug: it creates the attachment DB record
-    # but can't copy the file to PendingMedia. We do the copy ourselves.
-    if attachment_path and DAYONE_DB.exists():
-        _fix_pending_attachment(attachment_path)
+def flush_dayone_batch(cmds):
+    """Run a batch of dayone commands in a single shell process.
 
-    return result.stdout.strip()
+    The dayone CLI has no way to create several entries in one invocation, so
+    the commands are run as one shell script by a single /bin/sh. Each
+    command's exit status and output are reported back NUL-separated as it
+    finishes.
+
+    Yields one item per command, as soon as the shell reports it: None on
+    success, or an error message string.
+    """
+    if not cmds:
+        return
+
+    script = "".join(
+        f"out=$({shlex.join(cmd)} 2>&1); printf '%s\\0%s\\0' \"$?\" \"$out\"\n"
+        for cmd in cmds
+    )
+    reported = 0
+    # stderr goes to a temp file so the shell can't block on it
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            proc = subprocess.Popen(
+                ["/bin/sh", "-c", script], stdout=subprocess.PIPE, stderr=stderr
+            )
+        except OSError as e:
+            for _ in cmds:
+                yield f"dayone failed: {e}"
+            return
+
+        with proc:
+            fields = []
+            pending = b""
+            for chunk in iter(lambda: proc.stdout.read1(4096), b""):
+                *done, pending = (pending + chunk).split(b"\0")
+                fields.extend(done)
+                while len(fields) >= 2:
+                    status, output = fields[0], fields[1]
+                    del fields[:2]
+                    reported += 1
+                    if status == b"0":
+                        yield None
+                    else:
+                        output = output.decode(errors="replace").strip()
+                        yield f"dayone failed: {output}"
+
+        # The shell stopped before reporting every command
+        stderr.seek(0)
+        message = stderr.read().decode(errors="replace").strip() or "no result"
+        for _ in range(len(cmds) - reported):
+            yield f"dayone failed: {message}"
+
+
+def _export_batch(batch, exported, log_fd):
+    """Create the Day One entries for a batch of converted pages.
+
+    batch is a list of (page_id, label, date_str, cmd, png_path) tuples.
+    Prints a result line per page and records each exported page in the
+    export log as soon as its entry is created, while the rest of the batch
+    is still running. Returns (exported_count, error_count).
+
+    The dayone CLI has a sandbox bug where it can't copy media files into its
+    PendingMedia folder. We work around this by looking up the attachment UUID
+    it assigned in the database and copying the file there ourselves.
+    """
+    errors = flush_dayone_batch([cmd for _, _, _, cmd, _ in batch])
+
+    exported_count = 0
+    error_count = 0
+    for (page_id, label, date_str, _, png_path), error in zip(batch, errors):
+        if error:
+            error_count += 1
+            print(f"  {label}: FAILED - {error}")
+            continue
+
+        # The entry exists now, so track it as exported before anything else
+        # can fail (logged immediately for crash safety)
+        exported.add(page_id)
+        _append_export_log(log_fd, page_id)
+        exported_count += 1
+
+        # Work around dayone CLI sandbox bug: it creates the attachment DB
+        # record but can't copy the file to PendingMedia. We do the copy
+        # ourselves.
+        try:
+            if DAYONE_DB.exists():
+                _fix_pending_attachment(png_path)
+        except (OSError, shutil.Error) as e:
+            print(f"  {label}: OK ({date_str}), but copying the attachment failed - {e}")
+            continue
+        print(f"  {label}: OK ({date_str})")
+
+    return exported_count, error_count
+
+
+def _dayone_db():
+    """Return the shared read-only connection to the Day One database."""
+    global _dayone_conn
+    if _dayone_conn is None:
+        conn = sqlite3.connect(
+            f"file:{DAYONE_DB}?mode=ro", uri=True, check_same_thread=False
+        )
+        conn.executescript(
+            "PRAGMA query_only=1; PRAGMA cache_size=-20000; PRAGMA temp_store=MEMORY;"
+        )
+        atexit.register(conn.close)
+        _dayone_conn = conn
+    return _dayone_conn
 
 
 def _fix_pending_attachment(original_path):
@@ -244,13 +662,13 @@ def _fix_pending_attachment(original_path):
     ext = Path(original_path).suffix  # e.g. ".png"
 
     try:
-        conn = sqlite3.connect(f"file:{DAYONE_DB}?mode=ro", uri=True)
-        cursor = conn.execute(
+        cursor = _dayone_db().execute(
             "SELECT ZIDENTIFIER FROM ZATTACHMENT WHERE ZFILENAME = ? ORDER BY Z_PK DESC LIMIT 1",
             (original_name,),
         )
         row = cursor.fetchone()
-        conn.close()
+        # Close the cursor so the next lookup sees entries dayone adds later
+        cursor.close()
     except sqlite3.Error:
         return
 
@@ -272,10 +690,8 @@ def list_dayone_journals():
     if not DAYONE_DB.exists():
         return []
     try:
-        conn = sqlite3.connect(f"file:{DAYONE_DB}?mode=ro", uri=True)
-        cursor = conn.execute("SELECT ZNAME FROM ZJOURNAL ORDER BY ZNAME")
+        cursor = _dayone_db().execute("SELECT ZNAME FROM ZJOURNAL ORDER BY ZNAME")
         journals = sorted(set(row[0] for row in cursor if row[0]))
-        conn.close()
         return journals
     except sqlite3.Error:
         return []
@@ -284,7 +700,7 @@ def list_dayone_journals():
 def run_setup(data_dir):
     """Interactive setup: pick a notebook and Day One journal."""
     print("Scanning reMarkable notebooks...\n")
-    notebooks = discover_notebooks(data_dir)
+    notebooks, folders = discover_notebooks(data_dir)
 
     if not notebooks:
         print("No handwritten notebooks found in reMarkable data.")
@@ -293,7 +709,7 @@ def run_setup(data_dir):
 
     print(f"Found {len(notebooks)} handwritten notebook(s):\n")
     for i, nb in enumerate(notebooks, 1):
-        folder = get_folder_name(data_dir, nb["parent"])
+        folder = folders.get(nb["parent"], "")
         location = f"  [{folder}]" if folder else ""
         print(f"  {i:3d}. {nb['name']}{location}  ({nb['rm_count']}/{nb['page_count']} pages with content)")
 
@@ -370,6 +786,15 @@ def run_setup(data_dir):
     print(f"\nRun `deardayone` to export pages, or `deardayone --dry-run` to preview.")
 
 
+def _fmt_ts(ms):
+    """Format epoch milliseconds as local time, "%Y-%m-%d %H:%M:%S"."""
+    t = time.localtime(ms / 1000)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} "
+        f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+    )
+
+
 def run_export(data_dir, dry_run=False):
     """Export notebook pages to Day One."""
     config = load_config()
@@ -390,30 +815,40 @@ def run_export(data_dir, dry_run=False):
         print("  Run `deardayone --setup` to select a different notebook.")
         sys.exit(1)
 
-    # Get page list (returns list of {id, modified_ms} dicts)
+    # Get page list (returns list of (id, modified_ms) tuples)
     page_infos = get_page_list(data_dir, guid)
-    notebook_dir = Path(data_dir) / guid
+    notebook_dir = os.path.join(data_dir, guid)
 
     if not page_infos:
         print(f"Notebook '{notebook_name}' has no pages.")
         return
 
+    # List the notebook's .rm files once rather than checking each page.
+    # Paths in the page loops are built as plain strings.
+    notebook_prefix = notebook_dir + os.sep
+    try:
+        with os.scandir(notebook_dir) as it:
+            rm_files = {entry.name: entry for entry in it if entry.name.endswith(".rm")}
+    except OSError:
+        rm_files = {}
+
     # Determine what needs exporting
     to_export = []
-    for i, page_info in enumerate(page_infos):
-        page_id = page_info["id"]
+    for i, (page_id, page_modified_ms) in enumerate(page_infos):
         if page_id in exported:
             continue
-        rm_file = notebook_dir / f"{page_id}.rm"
-        if not rm_file.exists():
+        rm_name = f"{page_id}.rm"
+        rm_entry = rm_files.get(rm_name)
+        if rm_entry is None:
             continue
+        rm_file = notebook_prefix + rm_name
         # Use the page's modification timestamp from content metadata
-        if page_info["modified_ms"] > 0:
-            page_date = datetime.fromtimestamp(page_info["modified_ms"] / 1000)
+        if page_modified_ms > 0:
+            modified_ms = page_modified_ms
         else:
-            # Fallback to file mtime
-            page_date = datetime.fromtimestamp(rm_file.stat().st_mtime)
-        to_export.append((i, page_id, rm_file, page_date))
+            # Fallback to file mtime, stat'ed only for pages that need it
+            modified_ms = int(rm_entry.stat().st_mtime * 1000)
+        to_export.append((i, page_id, rm_file, modified_ms))
 
     already_exported = len(exported)
 
@@ -428,8 +863,8 @@ def run_export(data_dir, dry_run=False):
     print()
 
     if dry_run:
-        for i, page_id, rm_file, page_date in to_export:
-            date_str = page_date.strftime("%Y-%m-%d %H:%M:%S")
+        for i, page_id, rm_file, modified_ms in to_export:
+            date_str = _fmt_ts(modified_ms)
             print(f"  Page {i + 1}: {page_id[:8]}... ({date_str})")
         print(f"\nRun without --dry-run to export.")
         return
@@ -438,37 +873,66 @@ def run_export(data_dir, dry_run=False):
     exported_count = 0
     error_count = 0
 
-    with tempfile.TemporaryDirectory(prefix="deardayone_") as tmp_dir:
-        for i, page_id, rm_file, page_date in to_export:
-            page_num = i + 1
-            date_str = page_date.strftime("%Y-%m-%d %H:%M:%S")
-            png_path = Path(tmp_dir) / f"{page_id}.png"
-
-            print(f"  Page {page_num}/{len(page_infos)}: ", end="", flush=True)
-
-            try:
-                # Convert .rm to PNG
-                convert_rm_to_png(rm_file, png_path)
-
-                # Create Day One entry
-                body = f"Page {page_num} of {notebook_name}"
-                tags = ["reMarkable", notebook_name]
-                create_dayone_entry(journal, date_str, tags, png_path, body)
-
-                # Track as exported (save immediately for crash safety)
-                exported.add(page_id)
-                config["exported_pages"] = list(exported)
-                save_config(config)
-
-                exported_count += 1
-                print(f"OK ({date_str})")
-
-            except RuntimeError as e:
-                error_count += 1
-                print(f"FAILED - {e}")
-            except Exception as e:
-                error_count += 1
-                print(f"FAILED - {type(e).__name__}: {e}")
+    # Exported pages are appended to the export log as they complete, and
+    # folded into config.json every EXPORT_LOG_COMPACT_EVERY pages and at exit.
+    log_fd = _open_export_log()
+    unsaved_count = 0
+    try:
+        with tempfile.TemporaryDirectory(prefix="deardayone_") as tmp_dir:
+            # Conversion (rmc + Inkscape) has no dependency between pages, so
+            # run it in parallel. Day One entries are created in batches as
+            # pages finish converting.
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                tmp_prefix = tmp_dir + os.sep
+                futures = {}
+                for i, page_id, rm_file, modified_ms in to_export:
+                    png_path = tmp_prefix + page_id + ".png"
+                    future = executor.submit(convert_rm_to_png, rm_file, png_path)
+                    futures[future] = (i, page_id, modified_ms)
+
+                tags = ("reMarkable", notebook_name)
+                batch = []
+                for future in as_completed(futures):
+                    i, page_id, modified_ms = futures[future]
+                    page_num = i + 1
+                    date_str = _fmt_ts(modified_ms)
+                    label = f"Page {page_num}/{len(page_infos)}"
+
+                    try:
+                        png_path = future.result()
+                    except RuntimeError as e:
+                        error_count += 1
+                        print(f"  {label}: FAILED - {e}")
+                        continue
+                    except Exception as e:
+                        error_count += 1
+                        print(f"  {label}: FAILED - {type(e).__name__}: {e}")
+                        continue
+
+                    body = f"Page {page_num} of {notebook_name}"
+                    cmd = build_dayone_cmd(journal, date_str, tags, png_path, body)
+                    batch.append((page_id, label, date_str, cmd, png_path))
+
+                    if len(batch) >= DAYONE_BATCH_SIZE:
+                        ok, failed = _export_batch(batch, exported, log_fd)
+                        exported_count += ok
+                        error_count += failed
+                        unsaved_count += ok
+                        batch = []
+
+                        if unsaved_count >= EXPORT_LOG_COMPACT_EVERY:
+                            save_config(config, exported)
+                            unsaved_count = 0
+
+                if batch:
+                    ok, failed = _export_batch(batch, exported, log_fd)
+                    exported_count += ok
+                    error_count += failed
+                    unsaved_count += ok
+    finally:
+        os.close(log_fd)
+        if unsaved_count:
+            save_config(config, exported)
 
     print()
     print(f"Done! {exported_count} page(s) exported, {error_count} error(s).")